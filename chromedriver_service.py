@@ -0,0 +1,244 @@
+"""
+ChromeDriver Service
+Keeps a long-lived chromedriver process running between scraper runs so each
+run attaches to it instead of cold-starting a new driver
+"""
+
+import os
+import json
+import time
+import shutil
+import requests
+import subprocess
+
+from contextlib import contextmanager
+from selenium import webdriver
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 9515
+MAX_USES_PER_INSTANCE = 20  # Recycle the service after this many sessions
+STATE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".chromedriver_service.json"
+)
+LOCK_FILE = f"{STATE_FILE}.lock"
+LOCK_STALE_AFTER = 300  # A lock older than this was left by a crashed run
+SESSION_MAX_AGE = 6 * 3600  # Sessions never released after this long are assumed dead
+
+
+def service_url(port=SERVICE_PORT):
+    """Base URL of the chromedriver service"""
+    return f"http://{SERVICE_HOST}:{port}"
+
+
+def _local_session():
+    """HTTP session for localhost that ignores any proxy environment variables"""
+    session = requests.Session()
+    session.trust_env = False
+    return session
+
+
+def is_running(port=SERVICE_PORT):
+    """
+    Check whether a chromedriver service is accepting sessions
+    Args: port (int): Service port
+    Returns: bool: True if the service reports ready
+    """
+    try:
+        with _local_session() as s:
+            response = s.get(f"{service_url(port)}/status", timeout=2)
+            return bool(response.json().get("value", {}).get("ready"))
+    except (requests.RequestException, ValueError):
+        return False
+
+
+def find_executable():
+    """
+    Locate the chromedriver binary the same way the rest of the repo gets it
+    webdriver-manager's cache first, then PATH
+    Returns: str: Path to chromedriver
+    """
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"✗ webdriver-manager could not provide chromedriver: {e}")
+
+    executable = shutil.which("chromedriver")
+    if not executable:
+        raise FileNotFoundError("chromedriver executable not found via webdriver-manager or on PATH")
+    return executable
+
+
+def start_service(port=SERVICE_PORT, timeout=10):
+    """
+    Launch chromedriver detached from this process and wait until it is ready
+    Args:   port (int): Port to listen on
+            timeout (int): Seconds to wait for the service to come up
+    """
+    executable = find_executable()
+
+    if os.name == "nt":
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        detach = {"creationflags": flags}
+    else:
+        detach = {"start_new_session": True}
+
+    subprocess.Popen(
+        [executable, f"--port={port}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **detach,
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_running(port):
+            print(f"✓ Started chromedriver service on port {port}")
+            return
+        time.sleep(0.1)
+
+    raise RuntimeError(f"chromedriver service did not start on port {port}")
+
+
+def stop_service(port=SERVICE_PORT, timeout=10):
+    """
+    Shut down a running chromedriver service and wait until it has exited
+    Args:   port (int): Service port
+            timeout (int): Seconds to wait for the service to go away
+    """
+    try:
+        with _local_session() as s:
+            s.get(f"{service_url(port)}/shutdown", timeout=5)
+    except requests.RequestException:
+        pass
+
+    # /status can still answer while the process is shutting down
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not is_running(port):
+            print(f"✓ Stopped chromedriver service on port {port}")
+            return
+        time.sleep(0.1)
+
+    raise RuntimeError(f"chromedriver service on port {port} did not shut down")
+
+
+@contextmanager
+def _state_lock(timeout=60):
+    """
+    Serialise access to the service state between concurrent runs
+    Args: timeout (int): Seconds to wait for the lock
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            # Break a lock left behind by a run that crashed while holding it
+            try:
+                if time.time() - os.path.getmtime(LOCK_FILE) > LOCK_STALE_AFTER:
+                    os.remove(LOCK_FILE)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise RuntimeError("Timed out waiting for the chromedriver service lock")
+            time.sleep(0.05)
+
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(LOCK_FILE)
+
+
+def _load_state():
+    """Load the service usage counter and attached sessions"""
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    # Drop sessions whose run never released them
+    cutoff = time.time() - SESSION_MAX_AGE
+    state["active"] = {
+        session_id: started_at
+        for session_id, started_at in state.get("active", {}).items()
+        if started_at >= cutoff
+    }
+    state.setdefault("uses", 0)
+    return state
+
+
+def _save_state(state):
+    """Persist the service usage counter and attached sessions"""
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _restart_service(port):
+    """Stop and start the service, returning a fresh state"""
+    stop_service(port)
+    start_service(port)
+    return {"uses": 0, "active": {}}
+
+
+def get_driver(options, port=SERVICE_PORT, max_uses=MAX_USES_PER_INSTANCE):
+    """
+    Attach a new browser session to the chromedriver service
+    Starts the service if needed and recycles it after max_uses sessions
+    Args:   options (Options): Chrome options for the session
+            port (int): Service port
+            max_uses (int): Sessions served before the service is restarted
+    Returns: webdriver.Remote: Driver connected to the service
+    """
+    with _state_lock():
+        state = _load_state()
+        running = is_running(port)
+
+        if running and state["uses"] >= max_uses:
+            # Shutting down would kill the sessions of other runs still attached
+            if state["active"]:
+                print(
+                    f"Deferring chromedriver recycle: {len(state['active'])} other run(s) attached"
+                )
+            else:
+                print(f"Recycling chromedriver service after {state['uses']} uses...")
+                state = _restart_service(port)
+                running = True
+
+        if not running:
+            start_service(port)
+            # Fresh service, fresh count
+            state = {"uses": 0, "active": {}}
+            _save_state(state)
+
+        try:
+            driver = webdriver.Remote(command_executor=service_url(port), options=options)
+        except Exception as e:
+            # E.g. Chrome auto-updated past the long-lived driver's version
+            if state["active"]:
+                raise
+            print(f"✗ Could not attach to chromedriver service ({e}), restarting it...")
+            state = _restart_service(port)
+            driver = webdriver.Remote(command_executor=service_url(port), options=options)
+
+        state["uses"] += 1
+        state["active"][driver.session_id] = time.time()
+        _save_state(state)
+
+    return driver
+
+
+def release_driver(driver):
+    """
+    Mark a session from get_driver as finished so the service may be recycled
+    Args: driver (webdriver.Remote): Driver returned by get_driver
+    """
+    with _state_lock():
+        state = _load_state()
+        state["active"].pop(driver.session_id, None)
+        _save_state(state)
@@ -7,18 +7,28 @@ By: Mathieu Drolet (mathieu.drolet@telus.com)
 
 import os
 import re
+import json
 import time
-import glob
+import httpx
+import asyncio
 import getpass
+import argparse
+import requests
+import xlsxwriter
 import polars as pl
 import configparser as cp
+import chromedriver_service
 
+from tqdm import tqdm
 from bs4 import BeautifulSoup
 from datetime import datetime
+from urllib.parse import urljoin, urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 
 # Switching dir to the script dir
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -31,6 +41,36 @@ USER_ID = config.get("tableau", "userid")
 SSO_USR = config.get("tableau", "sso_username")
 SSO_PWD = config.get("tableau", "sso_password")
 USE_PROXY = config.get("tableau", "use_proxy")
+PAT_NAME = config.get("tableau", "pat_name", fallback="")
+PAT_SECRET = config.get("tableau", "pat_secret", fallback="")
+API_VERSION = config.get("tableau", "api_version", fallback="3.19")
+
+# Patterns used in per-item loops, compiled once
+_WB_ID = re.compile(r"-(\d+)-")
+_VIEW_ID = re.compile(r"-(\d+)\.csv$")
+_EMPID_PREFIX = re.compile(r"^[TX]", re.IGNORECASE)
+
+# Positions of the employee ID and NT ID search types in the teamcards dropdown
+_TEAMCARDS_EMPID_OPTION = 5
+_TEAMCARDS_NTID_OPTION = 6
+
+# View links on a workbook page
+_VIEW_LINKS_XPATH = '//*[@id="app-root"]/div/div[1]/div/div/div/div[2]/div[2]/div/div[3]/div/div/div[2]/div[1]/div/div/div[2]/div/div/div/div[4]/div/span/a'
+
+
+def _id_from_url(url):
+    """
+    Extract the trailing numeric ID from a URL
+    Args: url (str): URL ending in an ID (e.g., '.../workbooks/12345')
+    Returns: str: The trailing digits, or None if there are none
+    """
+    if not url:
+        return None
+    i = len(url)
+    while i and url[i - 1].isdecimal():
+        i -= 1
+    return url[i:] or None
+
 
 class TableauStatsScraperError(Exception):
     """Custom exception for Tableau scraper errors"""
@@ -43,29 +83,54 @@ class TableauStatsScraper:
     Scraper for Tableau Server statistics
     """
 
-    def __init__(self, userid=USER_ID, sso_username=SSO_USR, sso_password=SSO_PWD, use_proxy=USE_PROXY):
+    def __init__(self, userid=USER_ID, sso_username=SSO_USR, sso_password=SSO_PWD, use_proxy=USE_PROXY,
+                 pat_name=PAT_NAME, pat_secret=PAT_SECRET, headless=True):
         """
         Initialize the scraper
         Args:   userid (str): User ID (e.g., 'T845443')
                 sso_username (str): SSO username for authentication
                 sso_password (str): SSO password for authentication
                 use_proxy (bool): Whether to use explicit proxy settings
+                pat_name (str): Personal access token name for the REST API (optional)
+                pat_secret (str): Personal access token secret for the REST API (optional)
+                headless (bool): Run the browser in headless mode when used as a context manager
         """
         self.userid = userid
         self.sso_username = sso_username or userid
         self.sso_password = sso_password
         self.use_proxy = use_proxy
+        self.headless = headless
+        self.pat_name = pat_name
+        self.pat_secret = pat_secret
         self.proxy = "198.161.14.25:8080"
         self.base_url = "https://tableau.tsl.telus.com"
         self.site = "tqbi"
+        self.api_url = f"{self.base_url}/api/{API_VERSION}"
+        self.api_site_id = None
+        self.api_user_id = None
+        self.api_signed_in_user = None
         self.downloads_dir = fr"C:\Users\{self.userid}\Downloads"
         self.output_dir = config.get("tableau", "output_dir") or self.downloads_dir
+        self.max_workers = 16
+        self.wait_timeout = 10
+        self.teamcards_cache_file = os.path.join(self.downloads_dir, "_teamcards_cache.json")
+        self.teamcards_cache_ttl = 30 * 24 * 3600  # Names rarely change
+        self.teamcards_negative_ttl = 24 * 3600  # Retry users not found after a day
+        self.workbooks_cache_file = os.path.join(
+            self.downloads_dir, f"_workbooks_cache-{self.userid}.parquet"
+        )
+        self.workbooks_cache_ttl = 24 * 3600
+        self.teamcards_url = "https://go/teamcards"
+        self._teamcards_form = None
         self.driver = None
+        self._service_driver = False
+        self.session = None
 
-    def setup_driver(self, headless=False):
+    def setup_driver(self, headless=False, reuse_service=True):
         """
         Set up the Chrome WebDriver with download preferences
-        Args: headless (bool): Run browser in headless mode
+        Args:   headless (bool): Run browser in headless mode
+                reuse_service (bool): Attach to the long-lived chromedriver service
         """
         # Clear proxy environment variables to use Windows system proxy
         no_proxy = "localhost,127.0.0.1,::1"
@@ -86,6 +151,9 @@ class TableauStatsScraper:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        # Only the DOM is scraped; skip rendering images and web fonts
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-remote-fonts")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option("useAutomationExtension", False)
 
@@ -95,6 +163,8 @@ class TableauStatsScraper:
             "download.prompt_for_download": False,
             "download.directory_upgrade": True,
             "safebrowsing.enabled": True,
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.cookies": 1,
         }
         chrome_options.add_experimental_option("prefs", prefs)
 
@@ -114,6 +184,16 @@ class TableauStatsScraper:
 
         print("Setting up Chrome driver...")
 
+        # Attach to the chromedriver service to skip the cold driver start
+        if reuse_service:
+            try:
+                self.driver = chromedriver_service.get_driver(chrome_options)
+                self._service_driver = True
+                print("✓ Chrome driver attached to chromedriver service!")
+                return
+            except Exception as e1:
+                print(f"✗ Method 1 failed: {e1}")
+
         # Try with webdriver-manager
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
@@ -122,7 +202,47 @@ class TableauStatsScraper:
             print(f"✗ Method 2 failed: {e2}")
             raise TableauStatsScraperError("Failed to setup Chrome driver")
 
-        self.driver.implicitly_wait(10)
+    def _wait(self, condition, timeout=None):
+        """
+        Wait explicitly for a condition instead of sleeping a fixed time
+        Args:   condition (callable): Expected condition to wait for
+                timeout (int): Seconds to wait (defaults to self.wait_timeout)
+        Returns:Whatever the condition returns once satisfied
+        """
+        return WebDriverWait(self.driver, timeout or self.wait_timeout).until(
+            condition
+        )
+
+    def _wait_for_links(self, xpath, previous=None):
+        """
+        Wait for a rendered list of links to replace the previous one and settle
+        Args:   xpath (str): XPath matching the links
+                previous (WebElement): A link from the previously loaded list (optional)
+        Returns:list: The link elements once their count stops changing
+        """
+        if previous is not None:
+            previous_href = previous.get_attribute("href")
+
+            # Hash routes re-render in place; wait until the old link is gone or reused
+            def moved_off(driver):
+                try:
+                    return previous.get_attribute("href") != previous_href
+                except StaleElementReferenceException:
+                    return True
+
+            self._wait(moved_off)
+
+        # Presence alone returns on the first link; wait until the count is stable
+        last_count = [-1]
+
+        def settled(driver):
+            links = driver.find_elements(By.XPATH, xpath)
+            if links and len(links) == last_count[0]:
+                return links
+            last_count[0] = len(links)
+            return False
+
+        return self._wait(settled)
 
     def login(self, skip_if_logged_in=True):
         """
@@ -131,7 +251,16 @@ class TableauStatsScraper:
         """
         print(f"Navigating to {self.base_url}...")
         self.driver.get(self.base_url)
-        time.sleep(3)
+
+        # Wait for the SSO redirect to land on the site (or give up and log in)
+        try:
+            self._wait(
+                EC.any_of(
+                    EC.url_contains("/#/site"), EC.title_contains("Tableau Server")
+                )
+            )
+        except TimeoutException:
+            pass
 
         current_url = self.driver.current_url
         page_title = self.driver.title
@@ -143,6 +272,7 @@ class TableauStatsScraper:
             "/#/site" in current_url or "Tableau Server" in page_title
         ):
             print("✓ Already logged in via SSO or existing session")
+            self._init_session()
             return
 
         # If manual login needed (shouldn't happen with SSO)
@@ -150,129 +280,241 @@ class TableauStatsScraper:
         if not self.sso_password:
             self.sso_password = getpass.getpass("Enter your Tableau password: ")
 
-    def get_user_workbooks(self):
+        self._init_session()
+
+    def _init_session(self):
+        """
+        Create an HTTP session sharing the browser's authenticated cookies
+        Used for REST API calls and direct data downloads, bypassing the browser entirely
+        """
+        session = requests.Session()
+
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain")
+            )
+
+        if self.use_proxy:
+            proxy_url = f"http://{self.proxy}"
+            session.proxies.update({"http": proxy_url, "https": proxy_url})
+
+        self.session = session
+
+    def _async_client(self, cookies=None, proxy=None):
+        """
+        Create an HTTP/2 client for many concurrent small requests
+        Args:   cookies (CookieJar): Cookies to send with every request (optional)
+                proxy (str): Explicit proxy URL (optional)
+        Returns:httpx.AsyncClient: Client multiplexing requests over pooled connections
+        """
+        return httpx.AsyncClient(
+            http2=True,
+            cookies=cookies,
+            proxy=proxy,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            timeout=60,
+            follow_redirects=True,
+        )
+
+    def _rest_signin(self):
+        """
+        Authenticate against the Tableau REST API
+        Uses the personal access token when configured, otherwise reuses the SSO session cookie
+        """
+        headers = {"Accept": "application/json"}
+
+        if self.pat_name and self.pat_secret:
+            payload = {
+                "credentials": {
+                    "personalAccessTokenName": self.pat_name,
+                    "personalAccessTokenSecret": self.pat_secret,
+                    "site": {"contentUrl": self.site},
+                }
+            }
+            response = self.session.post(
+                f"{self.api_url}/auth/signin", json=payload, headers=headers, timeout=60
+            )
+            response.raise_for_status()
+            token = response.json()["credentials"]["token"]
+        else:
+            token = self.session.cookies.get("workgroup_session_id")
+            if not token:
+                raise TableauStatsScraperError(
+                    "No SSO session cookie found; configure pat_name and pat_secret"
+                )
+
+        # The current session names the site and the signed-in user
+        headers["X-Tableau-Auth"] = token
+        response = self.session.get(
+            f"{self.api_url}/sessions/current", headers=headers, timeout=60
+        )
+        response.raise_for_status()
+        current = response.json()["session"]
+        self.api_site_id = current["site"]["id"]
+        self.api_signed_in_user = current["user"]
+
+        self.session.headers.update({"X-Tableau-Auth": token, "Accept": "application/json"})
+        print("✓ Authenticated with the Tableau REST API")
+
+    def _find_user_id(self):
+        """
+        Look up the REST API ID of the user whose content is scraped
+        The signed-in account may differ from self.userid, in which case search by name
+        Returns: str: Tableau user ID (LUID)
+        """
+        # Usually the scraped user is the signed-in one; Get Users on Site needs admin rights
+        signed_in_name = self.api_signed_in_user.get("name", "")
+        if signed_in_name.rsplit("\\", 1)[-1].lower() == str(self.userid).lower():
+            return self.api_signed_in_user["id"]
+
+        response = self.session.get(
+            f"{self.api_url}/sites/{self.api_site_id}/users",
+            params={"filter": f"name:eq:{self.userid}"},
+            timeout=60,
+        )
+        response.raise_for_status()
+
+        users = response.json().get("users", {}).get("user", [])
+        if not users:
+            raise TableauStatsScraperError(f"User {self.userid} not found on site {self.site}")
+
+        return users[0]["id"]
+
+    def get_user_workbooks(self, refresh=False):
         """
         Get all workbooks belonging to the user
+        The listing is cached on disk for workbooks_cache_ttl seconds
+        Args: refresh (bool): Ignore the cached listing and query the server
         Returns: pl.DataFrame: DataFrame with workbook names, URLs, and IDs
         """
-        url = f"{self.base_url}/#/site/{self.site}/user/corp.ads/{self.userid}/content"
-        print(f"\nNavigating to user page: {url}")
-        self.driver.get(url)
-        self.driver.maximize_window()
-        time.sleep(5)
+        if not refresh and os.path.exists(self.workbooks_cache_file):
+            age = time.time() - os.path.getmtime(self.workbooks_cache_file)
+            if age < self.workbooks_cache_ttl:
+                tableau_df = pl.read_parquet(self.workbooks_cache_file)
+                print(f"\n✓ Loaded {len(tableau_df)} workbooks from cache")
+                return tableau_df
 
-        print("Extracting workbook links...")
-        xpath = '//*[@id="app-root"]/div/div[1]/div/div/div/div[2]/div[2]/div/div[3]/div/div/div[2]/div[1]/div/div/div[2]/div/div/div/div[4]/div/span/a'
+        if not self.api_site_id:
+            self._rest_signin()
 
-        try:
-            elements = self.driver.find_elements(By.XPATH, xpath)
+        if not self.api_user_id:
+            self.api_user_id = self._find_user_id()
+
+        url = f"{self.api_url}/sites/{self.api_site_id}/users/{self.api_user_id}/workbooks"
+        print(f"\nQuerying workbooks: {url}")
 
+        try:
             workbooks_data = []
-            for el in elements:
-                name = el.text
-                url = el.get_attribute("href")
-                if url and "workbooks" in url:
-                    workbook_id = re.search(r"\d+$", url)
-                    workbook_id = workbook_id.group() if workbook_id else None
+            page_number = 1
+
+            while True:
+                response = self.session.get(
+                    url,
+                    params={"ownedBy": "true", "pageSize": 1000, "pageNumber": page_number},
+                    timeout=60,
+                )
+                response.raise_for_status()
+                payload = response.json()
+
+                for wb in payload.get("workbooks", {}).get("workbook", []):
+                    # The web page URL carries the numeric ID used by admin views
+                    wb_url = wb.get("webpageUrl")
+                    workbook_id = _id_from_url(wb_url)
                     workbooks_data.append(
-                        {"name": name, "url": url, "workbook_id": workbook_id}
+                        {"name": wb["name"], "url": wb_url, "workbook_id": workbook_id}
                     )
 
-            tableau_df = pl.DataFrame(workbooks_data)
+                pagination = payload["pagination"]
+                if page_number * int(pagination["pageSize"]) >= int(pagination["totalAvailable"]):
+                    break
+                page_number += 1
+
+            tableau_df = pl.DataFrame(
+                workbooks_data,
+                schema={"name": pl.Utf8, "url": pl.Utf8, "workbook_id": pl.Utf8},
+            )
             print(f"✓ Found {len(tableau_df)} workbooks")
-            return tableau_df
 
         except Exception as e:
             print(f"✗ Error extracting workbooks: {e}")
             raise
 
-    def download_view_stats(self, view_id, workbook_id):
+        # Caching is best-effort; the listing is already in hand
+        try:
+            os.makedirs(self.downloads_dir, exist_ok=True)
+            tableau_df.write_parquet(self.workbooks_cache_file)
+        except OSError as e:
+            print(f"✗ Could not write workbook cache: {e}")
+
+        return tableau_df
+
+    @staticmethod
+    def _write_file(part_file, new_file, body):
+        """
+        Write a downloaded body under a temporary name, then publish it
+        Args:   part_file (str): Temporary path to write to
+                new_file (str): Final path
+                body (bytes): File contents
+        """
+        with open(part_file, "wb") as f:
+            f.write(body)
+        os.replace(part_file, new_file)
+
+    async def download_view_stats(self, client, view_id, workbook_id):
         """
         Download 'Who Has Seen' stats for a specific view
-        Args:   view_id (str): View ID
+        Args:   client (httpx.AsyncClient): Client carrying the Tableau session cookies
+                view_id (str): View ID
                 workbook_id (str): Workbook ID (for filename)
         Returns:str: Path to downloaded file
         """
-        url = f"{self.base_url}/vizql/showadminview/views/WhoHasSeen?views_id={view_id}"
-        print(f"  Downloading stats for view {view_id}...")
-
-        try:
-            self.driver.get(url)
-            time.sleep(3)
-
-            # Click download button
-            download_btn = self.driver.find_element(By.XPATH, '//*[@id="download"]')
-            download_btn.click()
+        url = f"{self.base_url}/vizql/showadminview/views/WhoHasSeen.csv"
 
-            # Navigate menu with arrow keys
-            menu = self.driver.find_element(
-                By.XPATH, '//*[@id="viz-viewer-toolbar-download-menu"]'
-            )
-            menu.send_keys(Keys.ARROW_DOWN)
-            menu.send_keys(Keys.ENTER)
-            time.sleep(1)
-
-            # Handle popup window
-            handles = self.driver.window_handles
-            original_window = self.driver.current_window_handle
-
-            # Switch to popup
-            self.driver.switch_to.window(handles[1])
-            time.sleep(1)
+        # Keep the filename contract expected by parse_downloaded_files
+        new_file = os.path.join(
+            self.downloads_dir, f"Who Has Seen_data-{workbook_id}-{view_id}.csv"
+        )
 
-            # Click download button in popup
-            download_popup_btn = self.driver.find_element(
-                By.XPATH, "/html/body/div[1]/div/div/div/div[2]/div[1]/div[2]/button"
-            )
-            download_popup_btn.click()
+        # Write to a temporary name; the final file appears only once complete
+        part_file = f"{new_file}.part"
 
-            # Switch back to main window
-            self.driver.switch_to.window(original_window)
+        try:
+            async with client.stream(
+                "GET", url, params={"views_id": view_id}
+            ) as response:
+                response.raise_for_status()
+
+                # A login or SSO redirect lands on an HTML page, which is not the export
+                content_type = response.headers.get("content-type", "").lower()
+                if "csv" not in content_type and not content_type.startswith("text/plain"):
+                    raise TableauStatsScraperError(
+                        f"Unexpected content type {content_type or 'none'} (not a CSV)"
+                    )
 
-            # Close popup dialog
-            close_btn = self.driver.find_element(
-                By.XPATH, "/html/body/div[6]/div/div/div/div/div[3]/div/div/button"
-            )
-            close_btn.click()
-            time.sleep(3)
+                body = await response.aread()
 
-            # Rename file with workbook and view IDs
-            old_file = os.path.join(self.downloads_dir, "Who Has Seen_data.csv")
-            new_file = os.path.join(
-                self.downloads_dir, f"Who Has Seen_data-{workbook_id}-{view_id}.csv"
+            # Blocking disk I/O runs off the event loop so other streams keep flowing
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_file, part_file, new_file, body
             )
-
-            # Wait for file to be downloaded
-            max_wait = 10
-            for i in range(max_wait):
-                if os.path.exists(old_file):
-                    break
-                time.sleep(1)
-
-            if os.path.exists(old_file):
-                os.rename(old_file, new_file)
-                print(f"  ✓ Downloaded and saved as: {os.path.basename(new_file)}")
-                return new_file
-            else:
-                print(f"  ✗ File not downloaded")
-                return None
+            tqdm.write(f"  ✓ Downloaded and saved as: {os.path.basename(new_file)}")
+            return new_file
 
         except Exception as e:
-            print(f"  ✗ Error downloading view {view_id}: {e}")
+            tqdm.write(f"  ✗ Error downloading view {view_id}: {e}")
+            if os.path.exists(part_file):
+                os.remove(part_file)
             return None
 
-    def get_all_views_stats(self, tableau_df, refresh_data=True):
+    def collect_all_views(self, tableau_df):
         """
-        Get stats for all views in all workbooks
-        Args:   tableau_df (pl.DataFrame): DataFrame with workbook information
-                refresh_data (bool): Whether to download fresh data
-        Returns:list: Paths to downloaded files
+        Collect the views of every workbook with one page load per workbook
+        Args: tableau_df (pl.DataFrame): DataFrame with workbook information
+        Returns: pl.DataFrame: DataFrame with workbook IDs, view names, URLs, and IDs
         """
-        if not refresh_data:
-            print("Skipping data refresh")
-            return []
-
-        downloaded_files = []
+        views_data = []
+        # First link of the last list read, to detect when the page has moved on
+        previous_link = None
 
         print(f"\nProcessing {len(tableau_df)} workbooks...")
 
@@ -288,78 +530,186 @@ class TableauStatsScraper:
 
             # Load workbook page
             self.driver.get(workbook_url)
-            time.sleep(3)
-
-            # Extract view links
-            xpath = '//*[@id="app-root"]/div/div[1]/div/div/div/div[2]/div[2]/div/div[3]/div/div/div[2]/div[1]/div/div/div[2]/div/div/div/div[4]/div/span/a'
 
             try:
-                view_elements = self.driver.find_elements(By.XPATH, xpath)
+                # Wait for the view links, then read them all in one round trip
+                view_elements = self._wait_for_links(_VIEW_LINKS_XPATH, previous_link)
+                previous_link = view_elements[0]
+                links = self.driver.execute_script(
+                    "return arguments[0].map(a => [a.innerText, a.href]);",
+                    view_elements,
+                )
 
-                views_data = []
-                for el in view_elements:
-                    view_name = el.text
-                    view_url = el.get_attribute("href")
+                count = 0
+                for view_name, view_url in links:
                     if view_url:
-                        view_id = re.search(r"\d+$", view_url)
-                        view_id = view_id.group() if view_id else None
+                        view_id = _id_from_url(view_url)
                         views_data.append(
-                            {"name": view_name, "url": view_url, "view_id": view_id}
+                            {
+                                "workbook_id": workbook_id,
+                                "name": view_name,
+                                "url": view_url,
+                                "view_id": view_id,
+                            }
                         )
+                        count += 1
 
-                print(f"Found {len(views_data)} views in this workbook")
-
-                # Download stats for each view
-                for view in views_data:
-                    if view["view_id"]:
-                        file_path = self.download_view_stats(
-                            view["view_id"], workbook_id
-                        )
-                        if file_path:
-                            downloaded_files.append(file_path)
+                print(f"Found {count} views in this workbook")
 
             except Exception as e:
                 print(f"✗ Error processing workbook {workbook_name}: {e}")
                 continue
 
+        return pl.DataFrame(
+            views_data,
+            schema={
+                "workbook_id": pl.Utf8,
+                "name": pl.Utf8,
+                "url": pl.Utf8,
+                "view_id": pl.Utf8,
+            },
+        )
+
+    def download_all(self, views_df):
+        """
+        Download stats for all views concurrently over the HTTP session
+        Args: views_df (pl.DataFrame): DataFrame with workbook and view IDs
+        Returns: list: Paths to downloaded files
+        """
+        view_jobs = views_df.filter(pl.col("view_id").is_not_null()).select(
+            ["view_id", "workbook_id"]
+        )
+
+        if view_jobs.is_empty():
+            print("\n✗ No views found to download")
+            return []
+
+        print(f"\nDownloading stats for {len(view_jobs)} views...")
+
+        # Chrome used to create this on first download; the HTTP path has to
+        os.makedirs(self.downloads_dir, exist_ok=True)
+
+        downloaded_files = asyncio.run(self._download_all_async(view_jobs.rows()))
+
         print(f"\n✓ Downloaded {len(downloaded_files)} files")
         return downloaded_files
 
+    async def _download_all_async(self, view_jobs):
+        """
+        Download stats for (view_id, workbook_id) pairs over one HTTP/2 client
+        Args: view_jobs (list): (view_id, workbook_id) tuples
+        Returns: list: Paths to downloaded files
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+        proxy = f"http://{self.proxy}" if self.use_proxy else None
+
+        async with self._async_client(cookies=self.session.cookies, proxy=proxy) as client:
+
+            async def bounded(view_id, workbook_id):
+                async with semaphore:
+                    return await self.download_view_stats(client, view_id, workbook_id)
+
+            downloads = [
+                bounded(view_id, workbook_id) for view_id, workbook_id in view_jobs
+            ]
+
+            downloaded_files = []
+            with tqdm(total=len(downloads), desc="views") as pbar:
+                for next_done in asyncio.as_completed(downloads):
+                    file_path = await next_done
+                    if file_path:
+                        downloaded_files.append(file_path)
+                    pbar.update(1)
+
+        return downloaded_files
+
+    def get_all_views_stats(self, tableau_df, refresh_data=True):
+        """
+        Get stats for all views in all workbooks
+        Args:   tableau_df (pl.DataFrame): DataFrame with workbook information
+                refresh_data (bool): Whether to download fresh data
+        Returns:list: Paths to downloaded files
+        """
+        if not refresh_data:
+            print("Skipping data refresh")
+            return []
+
+        if tableau_df.is_empty():
+            print("\n✗ No workbooks to process")
+            return []
+
+        views_df = self.collect_all_views(tableau_df)
+        return self.download_all(views_df)
+
     def parse_downloaded_files(self, tableau_df):
         """
         Parse all downloaded CSV files and combine them
         Args: tableau_df (pl.DataFrame): Original workbook DataFrame
         Returns: pl.DataFrame: Combined views information
         """
-        pattern = os.path.join(self.downloads_dir, "Who Has Seen_data-*.csv")
-        files = glob.glob(pattern)
+        # One directory pass; dirent names are enough to filter, no extra stat
+        try:
+            with os.scandir(self.downloads_dir) as entries:
+                files = [
+                    entry.path
+                    for entry in entries
+                    if entry.name.startswith("Who Has Seen_data-")
+                    and entry.name.endswith(".csv")
+                ]
+        except FileNotFoundError:
+            files = []
+
+        if not files:
+            print("\n✗ No data files found to parse")
+            return pl.DataFrame()
 
         print(f"\nParsing {len(files)} downloaded files...")
 
+        # Workbook name and URL by ID, looked up per file instead of joined per row
+        wb_meta = {
+            row["workbook_id"]: (row["name"], row["url"])
+            for row in tableau_df.iter_rows(named=True)
+        }
+
         all_data = []
+        names = {}
 
         for file_path in files:
             filename = os.path.basename(file_path)
             try:
-                # Read CSV
-                df = pl.read_csv(file_path)
-
                 # Extract IDs from filename
-                workbook_id_match = re.search(r"-(\d+)-", filename)
-                view_id_match = re.search(r"-(\d+)\.csv", filename)
+                workbook_id_match = _WB_ID.search(filename)
+                view_id_match = _VIEW_ID.search(filename)
 
                 workbook_id = workbook_id_match.group(1) if workbook_id_match else None
                 view_id = view_id_match.group(1) if view_id_match else None
 
-                # Add IDs as columns
-                df = df.with_columns(
+                workbook_name, workbook_url = wb_meta.get(workbook_id, (None, None))
+
+                # Scan CSV lazily and add IDs and workbook info as columns
+                lf = pl.scan_csv(file_path).with_columns(
                     [
-                        pl.lit(workbook_id).alias("workbook_id"),
-                        pl.lit(view_id).alias("view_id"),
+                        pl.lit(workbook_name, dtype=pl.Utf8).alias("Workbook name"),
+                        pl.lit(workbook_id, dtype=pl.Utf8).alias("workbook_id"),
+                        pl.lit(view_id, dtype=pl.Utf8).alias("view_id"),
+                        pl.lit(workbook_url, dtype=pl.Utf8).alias("url"),
                     ]
                 )
 
-                all_data.append(df)
+                # Resolve the schema now so an unreadable file is skipped on its own
+                schema = lf.collect_schema()
+
+                # Counts exported with thousands separators ("1,234") come in as text
+                if schema.get("Measure Values") == pl.Utf8:
+                    lf = lf.with_columns(
+                        pl.col("Measure Values")
+                        .str.replace_all(",", "")
+                        .cast(pl.Int64, strict=False)
+                    )
+
+                names.update(dict.fromkeys(schema.names()))
+
+                all_data.append((filename, lf))
 
             except Exception as e:
                 print(f"  ✗ Error parsing {filename}: {e}")
@@ -369,21 +719,58 @@ class TableauStatsScraper:
             print("✗ No data files found to parse")
             return pl.DataFrame()
 
-        # Combine all data
-        views_info_df = pl.concat(all_data, how="diagonal")
+        try:
+            # Combine all data in one lazy pipeline
+            views_info_df = self._select_view_columns(
+                [lf for _, lf in all_data], names
+            ).collect(engine="streaming")
 
-        # Join with workbook info
-        merged = views_info_df.join(tableau_df, on="workbook_id", how="left")
+        except Exception as e:
+            # A file can still fail past its header; fall back to reading files one by one
+            reason = (str(e).splitlines() or [type(e).__name__])[0]
+            print(f"  ✗ Combined parse failed ({reason}), retrying file by file...")
+
+            frames = []
+            names = {}
+            for filename, lf in all_data:
+                try:
+                    df = lf.collect()
+                except Exception as e:
+                    print(f"  ✗ Error parsing {filename}: {e}")
+                    continue
+                frames.append(df.lazy())
+                names.update(dict.fromkeys(df.columns))
+
+            if not frames:
+                print("✗ No data files could be parsed")
+                return pl.DataFrame()
+
+            # Relaxed concat casts mismatched column types to a common supertype
+            try:
+                views_info_df = self._select_view_columns(
+                    frames, names, how="diagonal_relaxed"
+                ).collect()
+            except Exception as e:
+                print(f"✗ Could not combine parsed files: {e}")
+                return pl.DataFrame()
 
-        # Clean up column names
-        if "Measure Names" in merged.columns:
-            merged = merged.drop("Measure Names")
+        print(f"✓ Parsed data: {len(views_info_df)} rows")
+        return views_info_df
 
-        if "Measure Values" in merged.columns:
-            merged = merged.rename({"Measure Values": "views"})
+    def _select_view_columns(self, frames, names, how="diagonal"):
+        """
+        Concatenate per-file frames and keep the report columns in order
+        Args:   frames (list): LazyFrames, one per downloaded file
+                names (dict): Union of the frames' column names (ordered keys)
+                how (str): Polars concat strategy
+        Returns:pl.LazyFrame: Combined views information
+        """
+        merged = pl.concat(frames, how=how)
 
-        if "name" in merged.columns:
-            merged = merged.rename({"name": "Workbook name"})
+        # Clean up column names
+        if "Measure Values" in names:
+            merged = merged.rename({"Measure Values": "views"})
+            names = {"views" if name == "Measure Values" else name: None for name in names}
 
         # Select and reorder columns
         desired_cols = [
@@ -396,84 +783,229 @@ class TableauStatsScraper:
             "Username",
             "views",
         ]
-        existing_cols = [col for col in desired_cols if col in merged.columns]
-        merged = merged.select(existing_cols)
+        existing_cols = [col for col in desired_cols if col in names]
 
-        views_info_df = merged
+        return merged.select(existing_cols)
 
-        print(f"✓ Parsed data: {len(views_info_df)} rows")
-        return views_info_df
+    def _load_teamcards_cache(self):
+        """
+        Load cached teamcards lookups, dropping entries older than their TTL
+        Returns: dict: Username -> {"FullName": str, "found": bool, "fetched_at": float}
+        """
+        if not os.path.exists(self.teamcards_cache_file):
+            return {}
 
-    def get_full_names_from_teamcards(self, usernames):
+        try:
+            with open(self.teamcards_cache_file, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  ✗ Ignoring unreadable teamcards cache: {e}")
+            return {}
+
+        now = time.time()
+        fresh = {}
+        for username, entry in cache.items():
+            # Entries written before "found" existed stored misses as UNKNOWN
+            found = entry.get("found", entry.get("FullName") != "UNKNOWN")
+            ttl = self.teamcards_cache_ttl if found else self.teamcards_negative_ttl
+            if entry.get("fetched_at", 0) >= now - ttl:
+                fresh[username] = entry
+        return fresh
+
+    def _save_teamcards_cache(self, cache):
         """
-        Fetch full names for usernames from go/teamcards
-        Args: usernames (list): List of usernames to look up
-        Returns: pl.DataFrame: DataFrame with Username and FullName columns
+        Write teamcards lookups back to disk
+        Args: cache (dict): Username -> {"FullName": str, "found": bool, "fetched_at": float}
         """
-        print(f"\nFetching full names for {len(usernames)} users from go/teamcards...")
+        tmp_file = f"{self.teamcards_cache_file}.tmp"
 
-        full_names_data = []
+        # Caching is best-effort; a failed write must not lose the lookups
+        try:
+            os.makedirs(self.downloads_dir, exist_ok=True)
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, self.teamcards_cache_file)
+        except OSError as e:
+            print(f"  ✗ Could not write teamcards cache: {e}")
+
+    async def _discover_teamcards_form(self, client):
+        """
+        Read the go/teamcards search form once to learn its action and field names
+        Args: client (httpx.AsyncClient): Client for go/teamcards
+        Returns: dict: Form action, method, base fields and search type values
+        """
+        response = await client.get(self.teamcards_url)
+        response.raise_for_status()
+
+        soup = BeautifulSoup(response.text, "lxml")
+        form = soup.find("form")
+        if form is None:
+            raise TableauStatsScraperError("No search form found on go/teamcards")
+
+        dropdown = form.find("select")
+        inputs = form.find_all("input")
+        text_inputs = [el for el in inputs if el.get("type", "text").lower() == "text"]
+        if dropdown is None or not text_inputs:
+            raise TableauStatsScraperError("Unexpected go/teamcards form layout")
+
+        # Keep hidden fields and the named submit button, as a browser would
+        data = {
+            el["name"]: el.get("value", "")
+            for el in inputs
+            if el.get("name") and el.get("type", "").lower() in ("hidden", "submit")
+        }
 
-        for username in usernames:
-            print(f"  Looking up: {username}")
-            result = {"Username": username, "FullName": "UNKNOWN"}
+        options = dropdown.find_all("option")
+        empid_option = options[_TEAMCARDS_EMPID_OPTION]
+        ntid_option = options[_TEAMCARDS_NTID_OPTION]
+
+        return {
+            "action": urljoin(str(response.url), form.get("action") or ""),
+            "method": form.get("method", "get").lower(),
+            "data": data,
+            "type_field": dropdown["name"],
+            "query_field": text_inputs[0]["name"],
+            "empid": empid_option.get("value", empid_option.get_text(strip=True)),
+            "ntid": ntid_option.get("value", ntid_option.get_text(strip=True)),
+        }
 
-            try:
-                self.driver.get("https://go/teamcards")
-                time.sleep(5)
+    async def _fetch_teamcards_page(self, client, username, form):
+        """
+        Search go/teamcards for a username
+        Args:   client (httpx.AsyncClient): Client for go/teamcards
+                username (str): Username to look up
+                form (dict): Search form description from _discover_teamcards_form
+        Returns:str: HTML of the results page
+        """
+        data = dict(form["data"])
+        # Employee IDs start with T or X, which the search expects stripped
+        data[form["type_field"]] = form["empid"] if _EMPID_PREFIX.match(username) else form["ntid"]
+        data[form["query_field"]] = _EMPID_PREFIX.sub("", username)
 
-                # Select dropdown
-                dropdown = self.driver.find_element(
-                    By.XPATH,
-                    "/html/body/table[1]/tbody/tr[2]/td/table/tbody/tr/td/table/tbody/tr/td[2]/select",
-                )
+        if form["method"] == "post":
+            response = await client.post(form["action"], data=data)
+        else:
+            response = await client.get(form["action"], params=data)
+        response.raise_for_status()
 
-                # Determine if empid or ntid
-                if re.match(r"^[TX]", username, re.IGNORECASE):
-                    # empid - press down 5 times
-                    for _ in range(5):
-                        dropdown.send_keys(Keys.ARROW_DOWN)
-                else:
-                    # ntid - press down 6 times
-                    for _ in range(6):
-                        dropdown.send_keys(Keys.ARROW_DOWN)
-
-                # Enter search value
-                search_input = self.driver.find_element(
-                    By.XPATH,
-                    "/html/body/table[1]/tbody/tr[2]/td/table/tbody/tr/td/table/tbody/tr/td[2]/input[1]",
-                )
-                search_button = self.driver.find_element(
-                    By.XPATH,
-                    "/html/body/table[1]/tbody/tr[2]/td/table/tbody/tr/td/table/tbody/tr/td[2]/input[2]",
-                )
+        # A login or SSO redirect ends up elsewhere; that is an error, not a miss
+        if response.url.host != urlparse(self.teamcards_url).hostname:
+            raise TableauStatsScraperError(f"Redirected away from go/teamcards to {response.url}")
 
-                search_input.clear()
-                # Remove leading T or X
-                clean_username = re.sub(r"^[TX]", "", username, flags=re.IGNORECASE)
-                search_input.send_keys(clean_username)
-                search_button.click()
+        return response.text
 
-                time.sleep(2)
+    def _parse_teamcards_name(self, page_source, form):
+        """
+        Extract the full name from a teamcards results page
+        Args:   page_source (str): HTML of the results page
+                form (dict): Search form description from _discover_teamcards_form
+        Returns:str: Full name, or None if no result was found
+        """
+        soup = BeautifulSoup(page_source, "lxml")
 
-                # Parse result
-                page_source = self.driver.page_source
-                soup = BeautifulSoup(page_source, "html.parser")
-                tables = soup.find_all("table")
+        # Results pages repeat the search form; anything else can't say "not found"
+        if soup.find("select", attrs={"name": form["type_field"]}) is None:
+            raise TableauStatsScraperError("Response is not a go/teamcards results page")
 
-                if tables:
-                    last_table = tables[-1]
-                    rows = last_table.find_all("tr")
-                    if len(rows) > 1:
-                        cells = rows[1].find_all("td")
-                        if len(cells) > 1:
-                            result["FullName"] = cells[1].get_text(strip=True)
-                            print(f"    ✓ Found: {result['FullName']}")
+        tables = soup.find_all("table")
+        if not tables:
+            return None
 
-            except Exception as e:
-                print(f"    ✗ Error looking up {username}: {e}")
+        # Second cell of the second row of the last table holds the name
+        rows = tables[-1].find_all("tr", limit=2)
+        if len(rows) < 2:
+            return None
 
-            full_names_data.append(result)
+        cells = rows[1].find_all("td", limit=2)
+        if len(cells) < 2:
+            return None
+
+        return cells[1].get_text(strip=True) or None
+
+    async def _lookup_teamcards_names(self, usernames, cache):
+        """
+        Look up usernames on go/teamcards concurrently, filling the cache
+        Args:   usernames (list): Usernames missing from the cache
+                cache (dict): Username -> {"FullName": str, "found": bool, "fetched_at": float}
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        # Own client so Tableau cookies never go to go/teamcards
+        async with self._async_client() as client:
+            # The form layout is read once and reused for every lookup
+            if self._teamcards_form is None:
+                try:
+                    self._teamcards_form = await self._discover_teamcards_form(client)
+                except Exception as e:
+                    print(f"  ✗ Could not load go/teamcards search form: {e}")
+                    return
+            form = self._teamcards_form
+
+            async def lookup(username):
+                async with semaphore:
+                    try:
+                        page_source = await self._fetch_teamcards_page(
+                            client, username, form
+                        )
+                        full_name = self._parse_teamcards_name(page_source, form)
+                        return username, full_name, None
+                    except Exception as e:
+                        return username, None, e
+
+            lookups = [lookup(username) for username in usernames]
+            for i, next_done in enumerate(asyncio.as_completed(lookups), start=1):
+                username, full_name, error = await next_done
+
+                if error is not None:
+                    print(f"    ✗ Error looking up {username}: {error}")
+                    # A rejected submission may mean the form changed; re-read it next time
+                    if isinstance(error, httpx.HTTPStatusError):
+                        self._teamcards_form = None
+                else:
+                    # Cache misses too (with a shorter TTL) so unknown users aren't searched every run
+                    cache[username] = {
+                        "FullName": full_name if full_name is not None else "UNKNOWN",
+                        "found": full_name is not None,
+                        "fetched_at": time.time(),
+                    }
+                    if full_name is not None:
+                        print(f"    ✓ Found {username}: {full_name}")
+                    else:
+                        print(f"    ✗ Not found: {username}")
+
+                # Flush periodically so an interrupted run keeps its progress
+                if i % 25 == 0:
+                    self._save_teamcards_cache(cache)
+
+    def get_full_names_from_teamcards(self, usernames):
+        """
+        Fetch full names for usernames from go/teamcards
+        Lookups are cached on disk for teamcards_cache_ttl seconds
+        Args: usernames (list): List of usernames to look up
+        Returns: pl.DataFrame: DataFrame with Username and FullName columns
+        """
+        # Deduplicate while keeping order; a repeated username would fan out the join
+        usernames = [username for username in dict.fromkeys(usernames) if username]
+
+        cache = self._load_teamcards_cache()
+        to_fetch = [username for username in usernames if username not in cache]
+
+        print(
+            f"\nFetching full names for {len(usernames)} users from go/teamcards "
+            f"({len(usernames) - len(to_fetch)} cached)..."
+        )
+
+        if to_fetch:
+            asyncio.run(self._lookup_teamcards_names(to_fetch, cache))
+            self._save_teamcards_cache(cache)
+
+        full_names_data = [
+            {
+                "Username": username,
+                "FullName": cache[username]["FullName"] if username in cache else "UNKNOWN",
+            }
+            for username in usernames
+        ]
 
         return pl.DataFrame(full_names_data)
 
@@ -514,8 +1046,6 @@ class TableauStatsScraper:
         Args:   pivot_df (pl.DataFrame): Summary pivot DataFrame
                 views_info_df (pl.DataFrame): Detailed views DataFrame
         """
-        import pandas as pd  # Only import for Excel writing
-
         timestamp = datetime.now().strftime("%Y%m%d")
         filename = f"tableau-views-by-workbook-and-view-{self.userid}-{timestamp}.xlsx"
         filepath = os.path.join(self.output_dir, filename)
@@ -523,13 +1053,11 @@ class TableauStatsScraper:
         print(f"\nSaving results to: {filename}")
 
         try:
-            with pd.ExcelWriter(filepath, engine="openpyxl") as writer:
-                # Convert polars to pandas only for writing
-                pivot_df.to_pandas().to_excel(
-                    writer, sheet_name="Workbook Views Pivot", index=False
-                )
-                views_info_df.to_pandas().to_excel(
-                    writer, sheet_name="Workbook Views Details", index=False
+            # Polars writes straight from its buffers into one shared workbook
+            with xlsxwriter.Workbook(filepath) as workbook:
+                pivot_df.write_excel(workbook=workbook, worksheet="Workbook Views Pivot")
+                views_info_df.write_excel(
+                    workbook=workbook, worksheet="Workbook Views Details"
                 )
 
             print(f"✓ Results saved to: {filepath}")
@@ -545,9 +1073,15 @@ class TableauStatsScraper:
             self.driver.quit()
             print("\n✓ Browser closed")
 
+            if self._service_driver:
+                try:
+                    chromedriver_service.release_driver(self.driver)
+                except Exception as e:
+                    print(f"✗ Could not release chromedriver service session: {e}")
+
     def __enter__(self):
         """Context manager entry"""
-        self.setup_driver()
+        self.setup_driver(headless=self.headless)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -558,6 +1092,14 @@ class TableauStatsScraper:
 def main():
     """Main execution function"""
 
+    parser = argparse.ArgumentParser(description="Scrape Tableau Who Has Seen stats")
+    parser.add_argument(
+        "--refresh-workbooks",
+        action="store_true",
+        help="Ignore the cached workbook listing and query the server",
+    )
+    args = parser.parse_args()
+
     # SCRIPT SETTINGS
     refresh_data = True
     userid = USER_ID if USER_ID else None
@@ -585,7 +1127,11 @@ def main():
         scraper.login()
 
         # 2. Get user workbooks
-        tableau_df = scraper.get_user_workbooks()
+        tableau_df = scraper.get_user_workbooks(refresh=args.refresh_workbooks)
+
+        if tableau_df.is_empty():
+            print("\n✗ No workbooks found. Exiting.")
+            return
 
         # 3. Download stats for all views
         scraper.get_all_views_stats(tableau_df, refresh_data=refresh_data)